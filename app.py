@@ -2,10 +2,15 @@
 
 from __future__ import annotations
 
+import io
+import json
+
 import streamlit as st
 
-from deepseek_client import ask_deepseek, format_state_for_ai
+from deepseek_client import format_state_for_ai
+from game.events import EVENTS_BY_KEY
 from game.game import Game
+from llm_backends import ask_llm
 from story_api import (
     generate_plot_conflict,
     generate_reader_comments,
@@ -23,15 +28,101 @@ def _ensure_game() -> Game:
     return st.session_state.game
 
 
+TREND_POINTS = 240
+TREND_STATS = {
+    "总字数": "words",
+    "余额": "balance",
+    "收藏": "book_favorites",
+    "粉丝": "fans",
+    "压力": "stress",
+    "健康": "health",
+    "动力": "motivation",
+    "当月稿费": "monthly_royalty",
+    "当月打赏": "monthly_tips",
+}
+
+
+def render_trends(game: Game) -> None:
+    history = game.history
+    if len(history) < 2:
+        return
+    with st.expander("📈 历史趋势", expanded=False):
+        labels = st.multiselect(
+            "显示指标", list(TREND_STATS), default=["总字数", "余额"]
+        )
+        for label in labels:
+            # Long or endless games are downsampled so each chart stays cheap.
+            xs, ys = history.series(TREND_STATS[label], max_points=TREND_POINTS)
+            st.caption(label)
+            st.line_chart({"旬": xs, label: ys}, x="旬", y=label)
+        # Expander bodies run on every rerun, so only serialise on request.
+        # The seed and action log pin the exact rows, even after an undo
+        # followed by a different step.
+        version = (game.seed, bytes(game.timeline.actions))
+        if st.button("生成历史 CSV"):
+            buffer = io.StringIO()
+            history.export_csv(buffer)
+            st.session_state["history_csv"] = (version, buffer.getvalue())
+        exported = st.session_state.get("history_csv")
+        if exported and exported[0] == version:
+            st.download_button(
+                "下载历史 CSV", exported[1], file_name="history.csv", mime="text/csv"
+            )
+
+
+CHAPTER_PAGE_SIZE = 10
+
+
+def render_chapters(game: Game) -> None:
+    book = game.book
+    if not len(book):
+        return
+    with st.expander(f"📚 章节目录（共 {len(book)} 章，{book.total_words:,} 字）"):
+        start = int(
+            st.number_input(
+                "从第几章开始", min_value=1, max_value=len(book), value=1, step=1
+            )
+        )
+        stop = min(start + CHAPTER_PAGE_SIZE - 1, len(book))
+        st.caption(f"第 {start}–{stop} 章共 {book.words_between(start, stop):,} 字")
+        for chapter in book.chapters(start, stop):
+            st.markdown(
+                f"**第 {chapter.number} 章** · 第 {chapter.month} 月"
+                f"{_period_label(chapter.period)} · {chapter.words:,} 字"
+            )
+            if chapter.idea:
+                st.write(f"🪄 {chapter.idea}")
+            if chapter.conflict:
+                st.write(f"⚡ {chapter.conflict}")
+            for comment in chapter.comments:
+                st.caption(f"💬 {comment}")
+
+
 def main() -> None:
     st.set_page_config(page_title="Novel Author Simulator", layout="wide")
 
     st.sidebar.header("控制台")
     if st.sidebar.button("重新开始一局"):
+        if "game" in st.session_state:
+            st.session_state.game.close()
         st.session_state.game = Game("Kexin")
         st.rerun()
 
     game = _ensure_game()
+    undo_col, redo_col = st.sidebar.columns(2)
+    if undo_col.button("↩️ 撤销", disabled=not game.timeline.can_undo):
+        game.undo()
+        st.rerun()
+    if redo_col.button("↪️ 重做", disabled=not game.timeline.can_redo):
+        game.redo()
+        st.rerun()
+    st.sidebar.download_button(
+        "导出本局操作记录",
+        json.dumps(game.session_log()),
+        file_name="session.json",
+        mime="application/json",
+    )
+
     state = game.get_state()
     st.session_state.setdefault("story_idea", "")
     st.session_state.setdefault("plot_conflict", "")
@@ -46,6 +137,10 @@ def main() -> None:
     if state.get("just_burnout"):
         st.error("⚠️ 这几旬把自己彻底熬垮了，去医院检查花了 1000 元，下旬开始最好多安排休息或花钱解压。")
 
+    event = EVENTS_BY_KEY.get(state.get("last_event", ""))
+    if event is not None:
+        st.warning(f"🎲 随机事件·{event.label}：{event.message}")
+
     if st.session_state.get("plot_conflict"):
         st.info(f"⚡ 本旬剧情冲突：{st.session_state['plot_conflict']}")
 
@@ -98,6 +193,8 @@ def main() -> None:
     status_cols[3].metric("签约状态", "已签约" if state["signed"] else "未签约")
     status_cols[4].metric("入 V", "已入 V" if state["in_v"] else "未入 V")
 
+    render_trends(game)
+
     st.subheader("🪄 本旬写作灵感")
     if st.button("生成写作灵感"):
         st.session_state["story_idea"] = generate_story_idea(state)
@@ -109,7 +206,7 @@ def main() -> None:
         if st.button("获取 AI 编辑建议"):
             prompt = format_state_for_ai(state)
             try:
-                suggestion = ask_deepseek(prompt)
+                suggestion = ask_llm(prompt)
             except Exception as exc:
                 st.warning(f"调用 DeepSeek 失败：{exc}")
             else:
@@ -177,6 +274,8 @@ def main() -> None:
             for idx, c in enumerate(comments, 1):
                 st.markdown(f"**读者{idx}：** {c}")
 
+    render_chapters(game)
+
     st.subheader("🗓️ 选择本旬安排")
     plan_label = st.radio(
         "计划",
@@ -195,6 +294,8 @@ def main() -> None:
     }
     plan_key = plan_map[plan_label]
     if st.button("推进到下一旬"):
+        idea = st.session_state["story_idea"]
+        conflict = st.session_state["plot_conflict"]
         new_state = game.step(plan_key)
         st.session_state["story_idea"] = ""
         try:
@@ -207,6 +308,7 @@ def main() -> None:
             )
         except Exception:
             st.session_state["reader_comments"] = []
+        game.record_chapter(idea, conflict, st.session_state["reader_comments"])
         st.rerun()
 
 
@@ -0,0 +1,102 @@
+"""Import-time regression check for the simulation core.
+
+Each module is imported in a fresh interpreter under ``-X importtime``.
+The check fails when a module's cumulative import time goes over its
+budget, or when a module that must stay lightweight loads a third-party
+package. Run ``python check_import_budget.py``; exit status 1 means a
+regression.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+
+# module -> cumulative import budget in milliseconds
+BUDGETS_MS: dict[str, float] = {
+    "game.player": 40,
+    "game.game": 60,
+    "game.market": 60,
+    "game.analytics": 60,
+    "story_index": 40,
+    "llm_backends": 30,
+    "deepseek_client": 30,
+    "story_api": 60,
+}
+# These must import nothing outside the standard library and this repo.
+STDLIB_ONLY: tuple[str, ...] = tuple(BUDGETS_MS)
+LOCAL_MODULES = frozenset(
+    {"game", "story_api", "story_index", "llm_backends", "deepseek_client"}
+)
+REPEATS = 5
+
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+_LIST_MODULES = (
+    "import sys{imports}\n"
+    "print('\\n'.join(sorted({{name.partition('.')[0] for name in sys.modules}})))"
+)
+
+
+def _run(args: list[str]) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def import_time_ms(module: str) -> float:
+    """Best-of-``REPEATS`` cumulative import time of ``module`` in ms."""
+    best = float("inf")
+    for _ in range(REPEATS):
+        stderr = _run(["-X", "importtime", "-c", f"import {module}"]).stderr
+        for line in stderr.splitlines():
+            parts = [part.strip() for part in line.split("|")]
+            if len(parts) == 3 and parts[2] == module:
+                best = min(best, int(parts[1]) / 1000)
+    return best
+
+
+def _loaded_modules(module: str | None = None) -> set[str]:
+    imports = f", {module}" if module else ""
+    return set(_run(["-c", _LIST_MODULES.format(imports=imports)]).stdout.split())
+
+
+def third_party_imports(
+    module: str, startup: frozenset[str] = frozenset()
+) -> list[str]:
+    """Third-party packages ``module`` loads beyond the bare interpreter's.
+
+    ``startup`` is what ``site`` and ``.pth`` hooks already loaded before any
+    code ran; those are not the module's doing.
+    """
+    stdlib = set(sys.stdlib_module_names) | set(sys.builtin_module_names)
+    return sorted(
+        name
+        for name in _loaded_modules(module) - startup
+        if name not in stdlib and name not in LOCAL_MODULES and not name.startswith("_")
+    )
+
+
+def main() -> int:
+    failures = 0
+    for module, budget in BUDGETS_MS.items():
+        elapsed = import_time_ms(module)
+        status = "ok" if elapsed <= budget else "OVER BUDGET"
+        failures += elapsed > budget
+        print(f"{module:<18} {elapsed:7.1f} ms / {budget:.0f} ms  {status}")
+    startup = frozenset(_loaded_modules())
+    for module in STDLIB_ONLY:
+        extra = third_party_imports(module, startup)
+        if extra:
+            failures += 1
+            print(f"{module:<18} imports third-party modules: {', '.join(extra)}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,8 +4,6 @@ from __future__ import annotations
 
 import os
 
-from openai import OpenAI
-
 
 def format_state_for_ai(state: dict) -> str:
     period_label = {1: "上旬", 2: "中旬", 3: "下旬"}.get(state.get("period"), "未知")
@@ -29,6 +27,9 @@ def ask_deepseek(prompt: str) -> str:
     if not api_key:
         raise ValueError("缺少 DeepSeek API Key，请设置环境变量 DEEPSEEK_API_KEY。")
 
+    # openai 很重，只在真正调用时才导入，避免拖慢批量模拟和命令行的启动。
+    from openai import OpenAI
+
     client = OpenAI(api_key=api_key, base_url="https://api.deepseek.com")
 
     try:
@@ -0,0 +1,414 @@
+"""Streaming outcome analytics for large batches of simulated careers.
+
+Every summary here is mergeable: process-pool workers aggregate their own
+runs locally and the parent merges the partial results, so memory stays
+constant in the number of runs.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections import Counter
+from contextlib import redirect_stdout
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, Mapping
+import math
+import os
+import random
+
+from game.player import Player
+from game.utils import AliasTable
+
+LEDGER_FIELDS: tuple[str, ...] = (
+    "balance",
+    "monthly_royalty",
+    "monthly_tips",
+    "fans",
+    "book_favorites",
+)
+OUTCOME_FIELDS: tuple[str, ...] = (
+    "balance",
+    "words",
+    "fans",
+    "book_favorites",
+    "months",
+)
+OUTCOME_FLAGS: tuple[str, ...] = ("burnout", "signed", "in_v", "finished")
+DEFAULT_PLAN_WEIGHTS: dict[str, float] = {
+    "focus_writing": 0.6,
+    "part_time": 0.25,
+    "rest": 0.15,
+}
+
+Policy = Callable[[Player, random.Random], str]
+
+
+def weighted_policy(weights: Mapping[str, float]) -> Policy:
+    """Policy that draws a plan from ``weights`` with one uniform per period."""
+    plans = list(weights)
+    table = AliasTable([weights[plan] for plan in plans])
+
+    def choose(player: Player, rng: random.Random) -> str:
+        return plans[table.sample(rng)]
+
+    return choose
+
+
+class QuantileSketch:
+    """Log-bucketed quantile sketch with bounded relative error.
+
+    Values are mapped to buckets whose width grows geometrically, so any
+    quantile is answered within ``relative_accuracy`` of the true value and
+    two sketches with the same accuracy merge by adding bucket counts.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01) -> None:
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._positive: Counter[int] = Counter()
+        self._negative: Counter[int] = Counter()
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _index(self, magnitude: float) -> int:
+        return math.ceil(math.log(magnitude) / self._log_gamma)
+
+    def _value(self, index: int) -> float:
+        return 2 * self._gamma**index / (self._gamma + 1)
+
+    def add(self, value: float, weight: int = 1) -> None:
+        if value > 0:
+            self._positive[self._index(value)] += weight
+        elif value < 0:
+            self._negative[self._index(-value)] += weight
+        else:
+            self.zero_count += weight
+        self.count += weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: QuantileSketch) -> QuantileSketch:
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("cannot merge sketches with different accuracy")
+        self._positive.update(other._positive)
+        self._negative.update(other._negative)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q: float) -> float:
+        """Return the estimated ``q`` quantile, or NaN for an empty sketch."""
+        if not 0 <= q <= 1:
+            raise ValueError("q must be in [0, 1]")
+        if self.count == 0:
+            return math.nan
+        if q == 0:
+            return self.min
+        if q == 1:
+            return self.max
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self._negative, reverse=True):
+            seen += self._negative[index]
+            if seen > rank:
+                return max(self.min, -self._value(index))
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self._positive):
+            seen += self._positive[index]
+            if seen > rank:
+                return min(self.max, self._value(index))
+        return self.max
+
+    def quantiles(self, qs: Iterable[float]) -> dict[float, float]:
+        return {q: self.quantile(q) for q in qs}
+
+
+class Histogram:
+    """Fixed-edge histogram with underflow and overflow bins."""
+
+    def __init__(self, edges: Iterable[float]) -> None:
+        self.edges = tuple(sorted(edges))
+        if not self.edges:
+            raise ValueError("Histogram needs at least one edge")
+        self.counts = [0] * (len(self.edges) + 1)
+
+    def add(self, value: float, weight: int = 1) -> None:
+        self.counts[bisect_right(self.edges, value)] += weight
+
+    def merge(self, other: Histogram) -> Histogram:
+        if other.edges != self.edges:
+            raise ValueError("cannot merge histograms with different edges")
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        return self
+
+    def bins(self) -> list[tuple[float, float, int]]:
+        """Return ``(low, high, count)`` triples, including open-ended bins."""
+        bounds = (-math.inf, *self.edges, math.inf)
+        return [
+            (bounds[i], bounds[i + 1], count) for i, count in enumerate(self.counts)
+        ]
+
+
+@dataclass
+class RunningStats:
+    """Streaming mean/variance (Welford), mergeable with Chan's formula."""
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    min: float = math.inf
+    max: float = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: RunningStats) -> RunningStats:
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.variance)
+
+
+def _default_histograms() -> dict[str, Histogram]:
+    return {
+        "balance": Histogram([-20000, 0, 10000, 20000, 50000, 100000, 200000]),
+        "words": Histogram([60000, 120000, 200000, 300000]),
+        "fans": Histogram([10, 100, 500, 1000, 5000, 10000]),
+        "book_favorites": Histogram([300, 1000, 3000, 10000, 30000]),
+        "months": Histogram([6, 12, 24, 36]),
+    }
+
+
+@dataclass
+class OutcomeSummary:
+    """Mergeable summary of per-run outcomes and per-month ledgers."""
+
+    relative_accuracy: float = 0.01
+    runs: int = 0
+    flags: Counter[str] = field(default_factory=Counter)
+    sketches: dict[str, QuantileSketch] = field(default_factory=dict)
+    histograms: dict[str, Histogram] = field(default_factory=_default_histograms)
+    monthly: dict[str, list[RunningStats]] = field(default_factory=dict)
+    monthly_tiers: list[Counter[str]] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        for name in OUTCOME_FIELDS:
+            self.sketches.setdefault(name, QuantileSketch(self.relative_accuracy))
+        for name in LEDGER_FIELDS:
+            self.monthly.setdefault(name, [])
+
+    def add_month(self, month: int, ledger: Mapping[str, object]) -> None:
+        """Fold one month-end ledger (1-based ``month``) into the curves."""
+        index = month - 1
+        for name, curve in self.monthly.items():
+            while len(curve) <= index:
+                curve.append(RunningStats())
+            curve[index].add(float(ledger.get(name, 0)))
+        while len(self.monthly_tiers) <= index:
+            self.monthly_tiers.append(Counter())
+        self.monthly_tiers[index][str(ledger.get("update_tier", "normal"))] += 1
+
+    def add_run(self, outcome: Mapping[str, object]) -> None:
+        """Fold one finished run's outcome into the summary."""
+        self.runs += 1
+        for name in OUTCOME_FLAGS:
+            if outcome.get(name):
+                self.flags[name] += 1
+        for name, sketch in self.sketches.items():
+            if name in outcome:
+                sketch.add(float(outcome[name]))
+        for name, histogram in self.histograms.items():
+            if name in outcome:
+                histogram.add(float(outcome[name]))
+
+    def merge(self, other: OutcomeSummary) -> OutcomeSummary:
+        self.runs += other.runs
+        self.flags.update(other.flags)
+        for name, sketch in other.sketches.items():
+            if name in self.sketches:
+                self.sketches[name].merge(sketch)
+            else:
+                self.sketches[name] = sketch
+        for name, histogram in other.histograms.items():
+            if name in self.histograms:
+                self.histograms[name].merge(histogram)
+            else:
+                self.histograms[name] = histogram
+        for name, curve in other.monthly.items():
+            mine = self.monthly.setdefault(name, [])
+            for index, stats in enumerate(curve):
+                if index < len(mine):
+                    mine[index].merge(stats)
+                else:
+                    mine.append(RunningStats().merge(stats))
+        for index, tiers in enumerate(other.monthly_tiers):
+            if index < len(self.monthly_tiers):
+                self.monthly_tiers[index].update(tiers)
+            else:
+                self.monthly_tiers.append(Counter(tiers))
+        return self
+
+    def rate(self, flag: str) -> float:
+        return self.flags[flag] / self.runs if self.runs else 0.0
+
+    def curve(self, name: str) -> list[tuple[int, float, float]]:
+        """Return ``(month, mean, stddev)`` for one ledger field."""
+        return [
+            (index + 1, stats.mean, stats.stddev)
+            for index, stats in enumerate(self.monthly.get(name, []))
+        ]
+
+    def report(self, qs: Iterable[float] = (0.1, 0.5, 0.9, 0.99)) -> dict[str, object]:
+        qs = tuple(qs)
+        return {
+            "runs": self.runs,
+            "rates": {name: self.rate(name) for name in OUTCOME_FLAGS},
+            "quantiles": {
+                name: sketch.quantiles(qs) for name, sketch in self.sketches.items()
+            },
+            "histograms": {
+                name: histogram.bins() for name, histogram in self.histograms.items()
+            },
+        }
+
+
+def simulate_career(
+    months: int = 36,
+    plan_weights: Mapping[str, float] | None = None,
+    rng: random.Random | None = None,
+) -> Iterator[tuple[str, dict[str, object]]]:
+    """Play one career and stream ``("month", ledger)`` then ``("run", outcome)``.
+
+    Plans are drawn from ``rng`` with ``plan_weights``, and the player shares
+    the same generator, so a seeded ``rng`` makes the career reproducible.
+    """
+    choose = weighted_policy(plan_weights or DEFAULT_PLAN_WEIGHTS)
+    rng = rng or random.Random()
+    player = Player("batch", rng=rng)
+    burnout = False
+    finished = False
+    while player.month <= months:
+        plan = choose(player, rng)
+        month = player.month
+        player.advance_period(plan)
+        burnout = burnout or player.just_burnout
+        if player.month != month:
+            yield "month", {
+                "month": month,
+                "balance": player.balance,
+                "monthly_royalty": player.monthly_royalty,
+                "monthly_tips": player.monthly_tips,
+                "fans": player.fans,
+                "book_favorites": player.book_favorites,
+                "update_tier": player.update_tier,
+            }
+        over, reason = player.is_game_over()
+        if over:
+            finished = reason == "finished"
+            break
+    yield "run", {
+        "balance": player.balance,
+        "words": player.words,
+        "fans": player.fans,
+        "book_favorites": player.book_favorites,
+        "months": player.month - 1 if player.period == 1 else player.month,
+        "burnout": burnout,
+        "signed": player.signed,
+        "in_v": player.in_v,
+        "finished": finished,
+    }
+
+
+def consume(
+    events: Iterable[tuple[str, Mapping[str, object]]],
+    summary: OutcomeSummary | None = None,
+) -> OutcomeSummary:
+    """Fold a stream of ``("month", ledger)`` / ``("run", outcome)`` records."""
+    summary = summary or OutcomeSummary()
+    for kind, record in events:
+        if kind == "month":
+            summary.add_month(int(record["month"]), record)
+        elif kind == "run":
+            summary.add_run(record)
+        else:
+            raise ValueError(f"unknown record kind: {kind!r}")
+    return summary
+
+
+def run_batch(
+    runs: int,
+    months: int = 36,
+    seed: int | None = None,
+    plan_weights: Mapping[str, float] | None = None,
+) -> OutcomeSummary:
+    """Simulate ``runs`` careers in this process and return their summary."""
+    rng = random.Random(seed)
+    summary = OutcomeSummary()
+    # Player reports month-end settlements with print(); silence them here.
+    with open(os.devnull, "w", encoding="utf-8") as sink, redirect_stdout(sink):
+        for _ in range(runs):
+            consume(simulate_career(months, plan_weights, rng), summary)
+    return summary
+
+
+def run_parallel(
+    runs: int,
+    months: int = 36,
+    workers: int | None = None,
+    seed: int = 0,
+    chunk_size: int = 10_000,
+    plan_weights: Mapping[str, float] | None = None,
+) -> OutcomeSummary:
+    """Spread ``runs`` over a process pool and merge the workers' summaries."""
+    # Imported here: concurrent.futures.process drags in multiprocessing,
+    # which single-process users of this module should not pay for.
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunks = [
+        (min(chunk_size, runs - start), months, seed + index, plan_weights)
+        for index, start in enumerate(range(0, runs, chunk_size))
+    ]
+    summary = OutcomeSummary()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for partial in pool.map(_run_chunk, chunks):
+            summary.merge(partial)
+    return summary
+
+
+def _run_chunk(
+    args: tuple[int, int, int, Mapping[str, float] | None],
+) -> OutcomeSummary:
+    return run_batch(*args)
@@ -1,3 +1,267 @@
-"""Book model placeholders for manuscripts and progress tracking."""
+"""Book model: an append-only chapter store with a memory-mapped index.
 
-# TODO: Implement book data structure and related helpers.
+Chapter bodies (word count, idea, conflict, reader comments) are appended
+as JSON lines to ``chapters.seg``. Every chapter also gets one fixed-size
+record in ``chapters.idx``, which is memory-mapped for reads, so lookups,
+range scans and word-count aggregates never read the whole segment file.
+
+``truncate`` only cuts the index. The dropped chapters' bodies stay in the
+segment and their index records are kept, so ``reattach`` can bring a
+chapter back without rewriting it until the next ``append`` overwrites them.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import asdict, dataclass, field
+from typing import Iterable, Iterator
+import json
+import mmap
+import os
+import struct
+
+SEGMENT_NAME = "chapters.seg"
+INDEX_NAME = "chapters.idx"
+
+# offset, length, words, cumulative words, month, period (+ padding) = 32 bytes
+_INDEX_RECORD = struct.Struct("<QIIQIB3x")
+
+
+@dataclass
+class Chapter:
+    number: int  # 从 1 开始的章节号
+    month: int
+    period: int
+    words: int
+    idea: str = ""
+    conflict: str = ""
+    comments: list[str] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class ChapterEntry:
+    """Index-only view of a chapter; never touches the segment file."""
+
+    number: int
+    month: int
+    period: int
+    words: int
+    cumulative_words: int
+    offset: int
+    length: int
+
+
+class _CumulativeWords:
+    """Sequence view over the index's cumulative word counts for bisect."""
+
+    def __init__(self, book: Book) -> None:
+        self._book = book
+
+    def __len__(self) -> int:
+        return len(self._book)
+
+    def __getitem__(self, index: int) -> int:
+        return self._book.entry(index + 1).cumulative_words
+
+
+class Book:
+    """Append-only chapter store rooted at ``directory``."""
+
+    def __init__(self, directory: str | os.PathLike[str]) -> None:
+        self.directory = os.fspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        segment_path = os.path.join(self.directory, SEGMENT_NAME)
+        index_path = os.path.join(self.directory, INDEX_NAME)
+        self._segment = open(segment_path, "a+b")
+        self._index = open(index_path, "a+b")
+        # A torn trailing record from a crash is ignored and overwritten.
+        self._count = os.fstat(self._index.fileno()).st_size // _INDEX_RECORD.size
+        self._index.truncate(self._count * _INDEX_RECORD.size)
+        self._map: mmap.mmap | None = None
+        self._mapped_count = 0
+        self._total_words = 0
+        # End of the last indexed record in the segment.
+        self._end = 0
+        if self._count:
+            last = self.entry(self._count)
+            self._total_words = last.cumulative_words
+            self._end = last.offset + last.length + 1
+        # Segment bytes past the last indexed record (a chapter whose index
+        # record never landed) would sit between that record and new appends.
+        self._segment.truncate(self._end)
+        # Index records of truncated chapters, lowest chapter number last.
+        self._truncated = bytearray()
+
+    def __enter__(self) -> Book:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+            self._mapped_count = 0
+        self._segment.close()
+        self._index.close()
+
+    @property
+    def total_words(self) -> int:
+        return self._total_words
+
+    def append(
+        self,
+        words: int,
+        month: int,
+        period: int,
+        idea: str = "",
+        conflict: str = "",
+        comments: Iterable[str] = (),
+    ) -> Chapter:
+        chapter = Chapter(
+            number=self._count + 1,
+            month=month,
+            period=period,
+            words=words,
+            idea=idea,
+            conflict=conflict,
+            comments=list(comments),
+        )
+        payload = json.dumps(asdict(chapter), ensure_ascii=False).encode("utf-8")
+        self.drop_truncated()
+        offset = self._end
+        self._segment.write(payload + b"\n")
+        self._segment.flush()
+        self._index.write(
+            _INDEX_RECORD.pack(
+                offset,
+                len(payload),
+                words,
+                self._total_words + words,
+                month,
+                period,
+            )
+        )
+        self._index.flush()
+        self._count += 1
+        self._total_words += words
+        self._end = offset + len(payload) + 1
+        return chapter
+
+    def truncate(self, count: int) -> None:
+        """Drop every chapter after the first ``count`` ones.
+
+        Only the index shrinks; see ``reattach`` and ``drop_truncated``.
+        """
+        if count >= self._count:
+            return
+        count = max(0, count)
+        size = _INDEX_RECORD.size
+        self._end = self.entry(count + 1).offset
+        self._total_words = self.entry(count).cumulative_words if count else 0
+        if self._mapped_count < self._count:
+            self._remap()
+        records = self._map[count * size : self._count * size]
+        for start in range(len(records) - size, -1, -size):
+            self._truncated += records[start : start + size]
+        self._map.close()
+        self._map = None
+        self._mapped_count = 0
+        self._index.truncate(count * size)
+        self._count = count
+
+    def reattach(self, words: int, month: int, period: int) -> bool:
+        """Restore the next truncated chapter if it has this word count and date.
+
+        Only its index record is written again; the body is still in place.
+        """
+        if not self._truncated:
+            return False
+        size = _INDEX_RECORD.size
+        record = bytes(self._truncated[-size:])
+        offset, length, found, cumulative, found_month, found_period = (
+            _INDEX_RECORD.unpack(record)
+        )
+        if (found, found_month, found_period) != (words, month, period):
+            return False
+        del self._truncated[-size:]
+        self._index.write(record)
+        self._index.flush()
+        self._count += 1
+        self._total_words = cumulative
+        self._end = offset + length + 1
+        return True
+
+    def drop_truncated(self) -> None:
+        """Forget truncated chapters for good and release their segment bytes."""
+        if self._truncated:
+            self._truncated.clear()
+            self._segment.truncate(self._end)
+
+    def entry(self, number: int) -> ChapterEntry:
+        """Return the index record of chapter ``number`` in O(1)."""
+        if not 1 <= number <= self._count:
+            raise IndexError(f"chapter {number} out of range 1..{self._count}")
+        if self._mapped_count < number:
+            self._remap()
+        offset, length, words, cumulative, month, period = _INDEX_RECORD.unpack_from(
+            self._map, (number - 1) * _INDEX_RECORD.size
+        )
+        return ChapterEntry(number, month, period, words, cumulative, offset, length)
+
+    def chapter(self, number: int) -> Chapter:
+        """Read one chapter with a single positioned read of its record."""
+        entry = self.entry(number)
+        return _decode(self._read(entry.offset, entry.length))
+
+    def chapters(self, start: int, stop: int) -> Iterator[Chapter]:
+        """Yield chapters ``start`` through ``stop`` inclusive.
+
+        The records are contiguous in the segment, so the whole range is
+        fetched with one read bounded by the two index entries.
+        """
+        start = max(1, start)
+        stop = min(stop, self._count)
+        if start > stop:
+            return
+        first = self.entry(start)
+        last = self.entry(stop)
+        blob = self._read(first.offset, last.offset + last.length - first.offset)
+        for line in blob.split(b"\n"):
+            if line:
+                yield _decode(line)
+
+    def words_between(self, start: int, stop: int) -> int:
+        """Total words of chapters ``start`` through ``stop`` inclusive, in O(1)."""
+        start = max(1, start)
+        stop = min(stop, self._count)
+        if start > stop:
+            return 0
+        before = self.entry(start - 1).cumulative_words if start > 1 else 0
+        return self.entry(stop).cumulative_words - before
+
+    def chapter_at_word(self, word: int) -> int:
+        """Return the chapter number containing the ``word``-th word (0-based)."""
+        if not 0 <= word < self.total_words:
+            raise IndexError(f"word {word} out of range 0..{self.total_words - 1}")
+        return bisect_right(_CumulativeWords(self), word) + 1
+
+    def _remap(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        self._map = mmap.mmap(self._index.fileno(), 0, access=mmap.ACCESS_READ)
+        self._mapped_count = len(self._map) // _INDEX_RECORD.size
+
+    def _read(self, offset: int, length: int) -> bytes:
+        if hasattr(os, "pread"):
+            return os.pread(self._segment.fileno(), length, offset)
+        self._segment.seek(offset)
+        return self._segment.read(length)
+
+
+def _decode(payload: bytes) -> Chapter:
+    return Chapter(**json.loads(payload))
@@ -1,3 +1,224 @@
-"""Event definitions and placeholders for story beats."""
+"""Random story-beat events rolled once per period.
 
-# TODO: Define event types and handlers.
+Event weights depend only on a coarse *bucket* of the player's state
+(signed, in-V, stress/health/balance bands, update tier). Each distinct
+bucket gets one precomputed alias table, so a roll is a tuple build, a
+dict lookup and a single uniform draw. Batches of players are grouped by
+bucket and sampled against the shared table.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Sequence
+import random
+
+from game.utils import AliasTable
+
+if TYPE_CHECKING:
+    from game.player import Player
+
+# signed, in_v, stress band, health band, balance band, update tier
+Bucket = tuple[bool, bool, int, int, int, str]
+
+QUIET_WEIGHT = 30.0  # 大多数旬什么都不会发生
+
+
+def state_bucket(player: Player) -> Bucket:
+    if player.balance < 3000:
+        balance_band = 0
+    elif player.balance < 20000:
+        balance_band = 1
+    else:
+        balance_band = 2
+    return (
+        player.signed,
+        player.in_v,
+        min(player.stress // 25, 3),
+        min(player.health // 25, 3),
+        balance_band,
+        player.update_tier,
+    )
+
+
+@dataclass(frozen=True)
+class Event:
+    key: str
+    label: str
+    message: str
+    weight: Callable[[Bucket], float]  # 0 表示当前状态下不可能发生
+    apply: Callable[[Player, Any], None]
+
+
+def _editor_deadline_weight(bucket: Bucket) -> float:
+    signed, _, _, _, _, tier = bucket
+    if not signed:
+        return 0.0
+    return 4.0 if tier == "low" else 1.5
+
+
+def _editor_deadline(player: Player, rng: Any) -> None:
+    player.stress += 8
+    player.motivation += 4
+
+
+def _viral_chapter_weight(bucket: Bucket) -> float:
+    _, in_v, _, _, _, tier = bucket
+    weight = {"low": 0.5, "normal": 1.0, "high": 2.0, "overwork": 2.5}.get(tier, 1.0)
+    return weight * (1.5 if in_v else 1.0)
+
+
+def _viral_chapter(player: Player, rng: Any) -> None:
+    gain = rng.randint(200, 800)
+    if player.in_v:
+        gain *= 2
+    fans_gained = gain // 40
+    player.book_favorites += gain
+    player.favorites_delta_this_month += gain
+    player.fans += fans_gained
+    player.fans_delta_this_month += fans_gained
+    player.motivation += 10
+
+
+def _illness_weight(bucket: Bucket) -> float:
+    _, _, stress_band, health_band, _, _ = bucket
+    return 0.3 + stress_band * 0.7 + (3 - health_band) * 1.0
+
+
+def _illness(player: Player, rng: Any) -> None:
+    player.health -= rng.randint(10, 20)
+    player.motivation -= 5
+    player.balance -= 500
+
+
+def _rent_hike_weight(bucket: Bucket) -> float:
+    return 0.8
+
+
+def _rent_hike(player: Player, rng: Any) -> None:
+    # 房东涨租：一次性补三个月的差价。
+    player.balance -= max(100, player.rent_cost // 10) * 3
+    player.stress += 5
+
+
+def _plagiarism_drama_weight(bucket: Bucket) -> float:
+    signed, in_v, _, _, _, _ = bucket
+    if not signed:
+        return 0.0
+    return 1.0 if in_v else 0.3
+
+
+def _plagiarism_drama(player: Player, rng: Any) -> None:
+    lost = player.book_favorites // 20
+    player.book_favorites -= lost
+    player.favorites_delta_this_month -= lost
+    player.stress += 15
+    player.motivation -= 8
+
+
+EVENTS: tuple[Event, ...] = (
+    Event(
+        "editor_deadline",
+        "编辑催稿",
+        "编辑发来消息：这周的更新量可得跟上哦。压力上来了，但也有了点干劲。",
+        _editor_deadline_weight,
+        _editor_deadline,
+    ),
+    Event(
+        "viral_chapter",
+        "章节爆了",
+        "有一章被读者疯狂转发，收藏和粉丝一下子涨了不少！",
+        _viral_chapter_weight,
+        _viral_chapter,
+    ),
+    Event(
+        "illness",
+        "生病",
+        "熬夜太多病倒了，看病花了 500 元，身体也虚了一截。",
+        _illness_weight,
+        _illness,
+    ),
+    Event(
+        "rent_hike",
+        "房租上涨",
+        "房东通知涨租，一次性补了三个月的差价。",
+        _rent_hike_weight,
+        _rent_hike,
+    ),
+    Event(
+        "plagiarism_drama",
+        "抄袭风波",
+        "评论区有人带节奏说你抄袭，掉了一波收藏，心态有点崩。",
+        _plagiarism_drama_weight,
+        _plagiarism_drama,
+    ),
+)
+EVENTS_BY_KEY: dict[str, Event] = {event.key: event for event in EVENTS}
+
+
+class EventDeck:
+    """Samples events per bucket from lazily built, cached alias tables."""
+
+    def __init__(
+        self, events: Sequence[Event] = EVENTS, quiet_weight: float = QUIET_WEIGHT
+    ) -> None:
+        self.events = tuple(events)
+        self.quiet_weight = quiet_weight
+        self._tables: dict[Bucket, tuple[AliasTable, tuple[Event | None, ...]]] = {}
+
+    def table(self, bucket: Bucket) -> tuple[AliasTable, tuple[Event | None, ...]]:
+        cached = self._tables.get(bucket)
+        if cached is None:
+            outcomes: list[Event | None] = [None]
+            weights = [self.quiet_weight]
+            for event in self.events:
+                weight = event.weight(bucket)
+                if weight > 0:
+                    outcomes.append(event)
+                    weights.append(weight)
+            cached = (AliasTable(weights), tuple(outcomes))
+            self._tables[bucket] = cached
+        return cached
+
+    def draw(self, player: Player, rng: Any = random) -> Event | None:
+        table, outcomes = self.table(state_bucket(player))
+        return outcomes[table.sample(rng)]
+
+    def roll(self, player: Player, rng: Any = random) -> str:
+        """Draw and apply at most one event; return its key or ``""``."""
+        event = self.draw(player, rng)
+        if event is None:
+            return ""
+        event.apply(player, rng)
+        return event.key
+
+    def roll_batch(self, players: Sequence[Player], rng: Any = random) -> list[str]:
+        """Roll for many players, sampling each bucket group from one table.
+
+        Call between ``Player.begin_period`` and ``Player.end_period`` so the
+        events land where ``advance_period`` rolls them, before the clamp and
+        burnout checks.
+        """
+        groups: dict[Bucket, list[int]] = {}
+        for index, player in enumerate(players):
+            groups.setdefault(state_bucket(player), []).append(index)
+        keys = [""] * len(players)
+        for bucket, indices in groups.items():
+            table, outcomes = self.table(bucket)
+            prob, alias, size = table.prob, table.alias, len(table)
+            uniform = rng.random
+            for index in indices:
+                u = uniform() * size
+                slot = int(u)
+                event = outcomes[slot if u - slot < prob[slot] else alias[slot]]
+                if event is not None:
+                    event.apply(players[index], rng)
+                    keys[index] = event.key
+        return keys
+
+
+DEFAULT_DECK = EventDeck()
+
+
+def roll_period_event(player: Player, rng: Any = random) -> str:
+    return DEFAULT_DECK.roll(player, rng)
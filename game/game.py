@@ -2,22 +2,173 @@
 
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Iterable
+import random
+import shutil
+import tempfile
+import weakref
 
+from game.book import Book
+from game.history import PeriodHistory
 from game.player import Player
+from game.timeline import (
+    ACTIONS,
+    Delta,
+    Keyframe,
+    Timeline,
+    decode_actions,
+    encode_action,
+    restore,
+    snapshot,
+)
+
+
+def _close_book(book: Book, owned_dir: str | None) -> None:
+    book.close()
+    if owned_dir is not None:
+        shutil.rmtree(owned_dir, ignore_errors=True)
 
 
 class Game:
-    """Thin wrapper around Player for UI interactions."""
+    """Thin wrapper around Player for UI interactions.
 
-    def __init__(self, name: str) -> None:
+    Every action goes through ``_perform`` so it can be undone, redone and
+    replayed deterministically from ``seed`` and the one-byte action log.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        book_dir: str | None = None,
+        seed: int | None = None,
+        undo_limit: int = 16,
+    ) -> None:
+        self.seed = random.SystemRandom().randrange(1 << 32) if seed is None else seed
         self.player = Player(name)
+        self.history = PeriodHistory()
+        owned_dir = None if book_dir else tempfile.mkdtemp(prefix="novel-book-")
+        self.book = Book(book_dir or owned_dir)
+        # Closes the book (and removes a temporary book directory) when the
+        # game is closed or garbage-collected, whichever comes first.
+        self._finalizer = weakref.finalize(self, _close_book, self.book, owned_dir)
+        # 上一旬写出的章节（字数、月、旬），等待灵感/冲突/评论补齐后再写入 Book。
+        self._pending_chapter: tuple[int, int, int] | None = None
+        self.timeline = Timeline(self._keyframe(0), undo_limit=undo_limit)
+
+    def __enter__(self) -> Game:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the book; a temporary book directory is deleted."""
+        self._finalizer()
+
+    @classmethod
+    def replay(
+        cls, name: str, seed: int, actions: bytes, book_dir: str | None = None
+    ) -> Game:
+        """Rebuild a session exactly from its seed and action log."""
+        game = cls(name, book_dir=book_dir, seed=seed)
+        for method, args in decode_actions(actions):
+            game._perform(method, args)
+        return game
+
+    def session_log(self) -> dict[str, Any]:
+        """Everything ``Game.replay`` needs, in a JSON-friendly form."""
+        return {
+            "name": self.player.name,
+            "seed": self.seed,
+            "actions": self.timeline.actions.hex(),
+        }
+
+    def _keyframe(self, tick: int) -> Keyframe:
+        return Keyframe(
+            tick,
+            snapshot(self.player),
+            len(self.history),
+            len(self.book),
+            self._pending_chapter,
+        )
+
+    def _perform(
+        self, method: str, args: tuple[str, ...], keep_redo: bool = False
+    ) -> None:
+        code = encode_action(method, args)
+        if keep_redo:
+            # Redo and replay: restore undone chapter text before the delta
+            # records the book length, so undoing again keeps it.
+            self._reattach_chapter()
+        else:
+            # A new branch: chapters undone from the old one can't come back.
+            self.book.drop_truncated()
+        before = snapshot(self.player)
+        history_len, book_len = len(self.history), len(self.book)
+        pending = self._pending_chapter
+        self.player.rng.seed(f"{self.seed}:{len(self.timeline)}")
+        # One-shot notices belong to the action that raised them, so clearing
+        # them here keeps them in the log and out of get_state().
+        self.player.just_moved = False
+        getattr(self, f"_{method}")(*args)
+        delta = Delta.between(
+            before, snapshot(self.player), history_len, book_len, pending
+        )
+        self.timeline.record(code, delta, keep_redo=keep_redo)
+        if self.timeline.wants_keyframe():
+            self.timeline.add_keyframe(self._keyframe(len(self.timeline)))
+
+    def undo(self) -> bool:
+        """撤销上一步操作；超出撤销缓冲区时从最近的关键帧重放。"""
+        if not self.timeline.can_undo:
+            return False
+        delta = self.timeline.pop_undo()
+        if delta is None:
+            self.travel_to(len(self.timeline) - 1)
+            return True
+        delta.undo(self.player)
+        self.history.truncate(delta.history_len)
+        self.book.truncate(delta.book_len)
+        self._pending_chapter = delta.pending
+        return True
+
+    def redo(self) -> bool:
+        code = self.timeline.pop_redo()
+        if code is None:
+            return False
+        method, args = ACTIONS[code]
+        self._perform(method, args, keep_redo=True)
+        self._reattach_chapter()
+        return True
+
+    def travel_to(self, tick: int) -> None:
+        """Jump to the state after the first ``tick`` actions of this session."""
+        tick = max(0, tick)
+        while tick > len(self.timeline) and self.redo():
+            pass
+        if tick >= len(self.timeline):
+            return
+        keyframe, actions = self.timeline.rewind(tick)
+        restore(self.player, keyframe.state)
+        self.history.truncate(keyframe.history_len)
+        self.book.truncate(keyframe.book_len)
+        self._pending_chapter = keyframe.pending
+        for method, args in decode_actions(actions):
+            self._perform(method, args, keep_redo=True)
+        self._reattach_chapter()
+
+    def _reattach_chapter(self) -> None:
+        """Bring back the pending chapter's text if an undo truncated it."""
+        if self._pending_chapter is not None and self.book.reattach(
+            *self._pending_chapter
+        ):
+            self._pending_chapter = None
 
     def _get(self, name: str, default: Any = None) -> Any:
         return getattr(self.player, name, default)
 
     def get_state(self) -> dict[str, Any]:
-        state = {
+        return {
             "month": self._get("month", 1),
             "period": self._get("period", 1),
             "balance": self._get("balance", 0),
@@ -45,21 +196,48 @@ class Game:
             "just_in_v": self._get("just_in_v", False),
             "just_burnout": self._get("just_burnout", False),
             "just_moved": self._get("just_moved", False),
+            "last_event": self._get("last_event", ""),
         }
-        self.player.just_moved = False
-        return state
 
     def step(self, plan: str) -> dict[str, Any]:
-        self.player.advance_period(plan)
+        self._perform("step", (plan,))
         return self.get_state()
 
+    def _step(self, plan: str) -> None:
+        self.record_chapter()
+        month, period = self.player.month, self.player.period
+        self.player.advance_period(plan)
+        self.history.record(self.player)
+        if self.player.last_period_words > 0:
+            self._pending_chapter = (self.player.last_period_words, month, period)
+
+    def record_chapter(
+        self, idea: str = "", conflict: str = "", comments: Iterable[str] = ()
+    ) -> None:
+        """把上一旬写出的章节连同灵感、冲突和读者评论写入 Book。
+
+        没有待写入的章节时什么也不做；下一次 step 会自动写入尚未补齐文本的章节。
+        """
+        if self._pending_chapter is None:
+            return
+        words, month, period = self._pending_chapter
+        self.book.append(words, month, period, idea, conflict, comments)
+        self._pending_chapter = None
+
     def apply_activity(self, activity: str) -> dict[str, Any]:
         """对当前玩家应用一次花钱解压活动，并返回最新状态。"""
-        self.player.do_activity(activity)
+        self._perform("apply_activity", (activity,))
         return self.get_state()
 
+    def _apply_activity(self, activity: str) -> None:
+        self.player.do_activity(activity)
+
     def set_lifestyle(self, rent_level: str, food_level: str) -> dict[str, Any]:
         """更新玩家的房租与伙食档位，并刷新生活成本。"""
+        self._perform("set_lifestyle", (rent_level, food_level))
+        return self.get_state()
+
+    def _set_lifestyle(self, rent_level: str, food_level: str) -> None:
         old_rent_level = self.player.rent_level
         self.player.rent_level = rent_level
         self.player.food_level = food_level
@@ -70,4 +248,3 @@ class Game:
             self.player.stress = min(100, self.player.stress + 5)
             self.player.motivation = max(0, self.player.motivation - 3)
             self.player.just_moved = True
-        return self.get_state()
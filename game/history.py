@@ -0,0 +1,158 @@
+"""Append-only columnar per-period history of player stats."""
+
+from __future__ import annotations
+
+from array import array
+from typing import IO, Any, Iterator, Sequence
+import csv
+
+from game.player import Player
+from game.utils import lttb
+
+UPDATE_TIERS: tuple[str, ...] = ("low", "normal", "high", "overwork")
+
+# Column name -> array typecode. ``q`` holds signed 64-bit counters and
+# money, ``b`` holds flags and the encoded update tier.
+COLUMNS: dict[str, str] = {
+    "month": "q",
+    "period": "b",
+    "balance": "q",
+    "words": "q",
+    "stress": "b",
+    "health": "b",
+    "motivation": "b",
+    "fans": "q",
+    "book_favorites": "q",
+    "last_period_words": "q",
+    "words_this_month": "q",
+    "monthly_expense": "q",
+    "monthly_royalty": "q",
+    "monthly_tips": "q",
+    "update_tier": "b",
+    "signed": "b",
+    "in_v": "b",
+    "just_burnout": "b",
+}
+_BOOL_COLUMNS = frozenset({"signed", "in_v", "just_burnout"})
+
+
+class PeriodHistory:
+    """One typed ``array`` per stat; a row is appended after every period.
+
+    A row costs roughly 100 bytes, so even an endless game stays small and
+    every column can be handed to a chart or exporter without copying rows.
+    """
+
+    def __init__(self) -> None:
+        self.columns: dict[str, array] = {
+            name: array(code) for name, code in COLUMNS.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.columns["month"])
+
+    def record(self, player: Player) -> None:
+        for name, column in self.columns.items():
+            if name == "update_tier":
+                value = _encode_tier(player.update_tier)
+            else:
+                value = int(getattr(player, name))
+            column.append(value)
+
+    def truncate(self, length: int) -> None:
+        """Drop every row from ``length`` onwards."""
+        for column in self.columns.values():
+            del column[length:]
+
+    def column(self, name: str) -> array:
+        return self.columns[name]
+
+    def row(self, index: int) -> dict[str, Any]:
+        return {
+            name: _decode(name, column[index]) for name, column in self.columns.items()
+        }
+
+    def iter_rows(
+        self, start: int = 0, stop: int | None = None
+    ) -> Iterator[dict[str, Any]]:
+        stop = len(self) if stop is None else min(stop, len(self))
+        for index in range(start, stop):
+            yield self.row(index)
+
+    def series(
+        self, name: str, max_points: int | None = None
+    ) -> tuple[list[float], list[float]]:
+        """Return ``(step, value)`` lists for one stat, LTTB-downsampled if asked."""
+        ys: Sequence[float] = self.columns[name]
+        xs = range(1, len(ys) + 1)
+        if max_points is None:
+            return list(xs), list(ys)
+        return lttb(xs, ys, max_points)
+
+    def export_csv(self, fp: IO[str], chunk_rows: int = 1024) -> int:
+        """Stream the history to ``fp`` as CSV, ``chunk_rows`` rows at a time."""
+        writer = csv.writer(fp)
+        names = list(self.columns)
+        writer.writerow(names)
+        total = len(self)
+        for start in range(0, total, chunk_rows):
+            stop = min(start + chunk_rows, total)
+            writer.writerows(
+                [_decode(name, self.columns[name][i]) for name in names]
+                for i in range(start, stop)
+            )
+        return total
+
+    def export_parquet(self, path: str, chunk_rows: int = 65536) -> int:
+        """Stream the history to a Parquet file, one row group per chunk.
+
+        Needs the optional ``pyarrow`` dependency, imported only when called.
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError("Parquet 导出需要安装 pyarrow。") from exc
+
+        schema = pa.schema(
+            [
+                pa.field(name, _arrow_type(pa, name, column.typecode))
+                for name, column in self.columns.items()
+            ]
+        )
+        total = len(self)
+        with pq.ParquetWriter(path, schema) as writer:
+            for start in range(0, total, chunk_rows):
+                stop = min(start + chunk_rows, total)
+                arrays = [
+                    pa.array(
+                        [_decode(name, value) for value in column[start:stop]],
+                        type=schema.field(name).type,
+                    )
+                    for name, column in self.columns.items()
+                ]
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+        return total
+
+
+def _encode_tier(tier: str) -> int:
+    try:
+        return UPDATE_TIERS.index(tier)
+    except ValueError:
+        return UPDATE_TIERS.index("normal")
+
+
+def _arrow_type(pa: Any, name: str, typecode: str) -> Any:
+    if name == "update_tier":
+        return pa.string()
+    if name in _BOOL_COLUMNS:
+        return pa.bool_()
+    return pa.int64() if typecode == "q" else pa.int8()
+
+
+def _decode(name: str, value: int) -> Any:
+    if name == "update_tier":
+        return UPDATE_TIERS[value]
+    if name in _BOOL_COLUMNS:
+        return bool(value)
+    return value
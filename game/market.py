@@ -0,0 +1,282 @@
+"""Shared-market mode: many authors competing on one 新书千字榜.
+
+All authors advance in lockstep. The board ranks books that entered V in
+the last few months by favorites, using a Fenwick tree over favorite
+counts. Only books whose favorites changed are re-indexed after each
+period, and rank and k-th-best queries take O(log n). Every month a
+finite pool of new readers is split over the top of that same tree by
+rank (ties broken by author order), and a finite
+tip pool is split over signed books by favorites, so one author's gain is
+another's loss.
+"""
+
+from __future__ import annotations
+
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+from typing import Any, Iterator, Sequence
+import os
+import random
+
+from game.analytics import DEFAULT_PLAN_WEIGHTS, Policy, weighted_policy
+from game.events import EventDeck
+from game.player import Player
+
+
+@dataclass
+class MarketConfig:
+    board_size: int = 100  # 榜单展示的名次数
+    new_book_months: int = 3  # 入 V 后在新书榜上停留的月数
+    readers_per_listed_book: int = 600  # 榜单每个在榜名次每月带来的新读者
+    tips_per_author: int = 20  # 每位作者每月贡献给打赏池的金额（元）
+    rank_exponent: float = 1.0  # 名次越靠前分到的读者越多（Zipf 指数）
+    favorites_per_fan: int = 50
+    max_favorites: int = 1 << 21  # 排名树的值域上限，超出的收藏按上限计
+
+
+class _Fenwick:
+    """Counts of books per favorites value, with order-statistic queries."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.tree = [0] * (size + 1)
+        self.total = 0
+        self._top = 1 << (size.bit_length() - 1)
+
+    def add(self, value: int, delta: int) -> None:
+        self.total += delta
+        i = value + 1
+        tree, size = self.tree, self.size
+        while i <= size:
+            tree[i] += delta
+            i += i & -i
+
+    def count_at_most(self, value: int) -> int:
+        i = min(value + 1, self.size)
+        result = 0
+        tree = self.tree
+        while i > 0:
+            result += tree[i]
+            i -= i & -i
+        return result
+
+    def kth_smallest(self, k: int) -> int:
+        """Return the value of the ``k``-th smallest entry (1-based)."""
+        position = 0
+        step = self._top
+        tree = self.tree
+        while step:
+            nxt = position + step
+            if nxt <= self.size and tree[nxt] < k:
+                position = nxt
+                k -= tree[nxt]
+            step >>= 1
+        return position  # tree index position + 1 holds value ``position``
+
+
+class Market:
+    """Advances ``players`` together and settles board and tips from a shared pool."""
+
+    def __init__(
+        self,
+        players: Sequence[Player],
+        config: MarketConfig | None = None,
+        seed: int | None = None,
+        deck: EventDeck | None = None,
+    ) -> None:
+        self.players = list(players)
+        self.config = config or MarketConfig()
+        self.rng = random.Random(seed)
+        self.deck = deck or EventDeck()
+        self.board = _Fenwick(self.config.max_favorites)
+        self._ids = {id(player): index for index, player in enumerate(self.players)}
+        count = len(self.players)
+        self._in_v_month = [0] * count  # 0 表示尚未入 V
+        self._board_value = [-1] * count  # 当前在排名树里的收藏值，-1 表示不在榜
+        self._by_value: dict[int, set[int]] = {}
+        self._signed_favorites = [0] * count
+        self._board_due = False  # 本月是否有新书榜待结算
+        self.total_signed_favorites = 0
+        self._rank_weights = [0.0]
+        for rank in range(1, self.config.board_size + 1):
+            self._rank_weights.append(
+                self._rank_weights[-1] + rank ** -self.config.rank_exponent
+            )
+        for player in self.players:
+            player.market = self
+        self._sync()
+
+    @classmethod
+    def with_authors(
+        cls, count: int, config: MarketConfig | None = None, seed: int | None = None
+    ) -> Market:
+        rng = random.Random(None if seed is None else seed + 1)
+        players = [Player(f"author-{i}", rng=rng) for i in range(count)]
+        return cls(players, config, seed)
+
+    @property
+    def listed(self) -> int:
+        return min(self.config.board_size, self.board.total)
+
+    @property
+    def reader_pool(self) -> int:
+        return self.config.readers_per_listed_book * self.listed
+
+    @property
+    def tip_pool(self) -> int:
+        return self.config.tips_per_author * len(self.players)
+
+    def _clamp(self, favorites: int) -> int:
+        return max(0, min(favorites, self.config.max_favorites - 1))
+
+    def rank_of(self, favorites: int) -> int:
+        """Board rank a book with ``favorites`` would have right now."""
+        value = self._clamp(favorites)
+        return 1 + self.board.total - self.board.count_at_most(value)
+
+    def _top(self, k: int) -> list[int]:
+        """Indices of the ``k`` best books, ties broken by author order."""
+        k = min(k, self.board.total)
+        result: list[int] = []
+        position = self.board.total
+        while len(result) < k:
+            value = self.board.kth_smallest(position)
+            authors = sorted(self._by_value[value])
+            result.extend(authors[: k - len(result)])
+            position -= len(authors)
+        return result
+
+    def leaderboard(self, k: int | None = None) -> list[tuple[int, Player]]:
+        """Top ``k`` board entries as ``(rank, player)``, best first.
+
+        These are the ranks the month-end payout uses.
+        """
+        top = self._top(k or self.config.board_size)
+        return [(rank, self.players[index]) for rank, index in enumerate(top, 1)]
+
+    def _board_remove(self, index: int) -> None:
+        value = self._board_value[index]
+        if value < 0:
+            return
+        self.board.add(value, -1)
+        bucket = self._by_value[value]
+        bucket.discard(index)
+        if not bucket:
+            del self._by_value[value]
+        self._board_value[index] = -1
+
+    def _board_insert(self, index: int, value: int) -> None:
+        self.board.add(value, 1)
+        self._by_value.setdefault(value, set()).add(index)
+        self._board_value[index] = value
+
+    def _sync(self, settling: bool = False) -> None:
+        """Re-index books whose board eligibility or favorites changed.
+
+        A book is on the board for ``new_book_months`` months, counting the
+        month it entered V. ``settling`` looks at the month that has just
+        ended, so the board matches the books ``settle_new_book_board``
+        accepted for it.
+        """
+        window = self.config.new_book_months
+        for index, player in enumerate(self.players):
+            if player.in_v and not self._in_v_month[index]:
+                # 入 V 只在月末结算时发生，此时月份已经加一。
+                self._in_v_month[index] = player.month - 1
+            entered = self._in_v_month[index]
+            month = player.month - 1 if settling else player.month
+            on_board = bool(entered) and month - entered < window
+            value = self._clamp(player.book_favorites) if on_board else -1
+            if value != self._board_value[index]:
+                self._board_remove(index)
+                if value >= 0:
+                    self._board_insert(index, value)
+
+            favorites = player.book_favorites if player.signed else 0
+            if favorites != self._signed_favorites[index]:
+                self.total_signed_favorites += favorites - self._signed_favorites[index]
+                self._signed_favorites[index] = favorites
+
+    def settle_new_book_board(self, player: Player) -> None:
+        """Mark this month's board as due for payout; called from ``Player``."""
+        index = self._ids[id(player)]
+        entered = self._in_v_month[index] or player.month
+        if player.month - entered >= self.config.new_book_months:
+            player.new_rank_used = True
+            return
+        self._board_due = True
+
+    def _settle_board(self) -> None:
+        """Split the month's reader pool over the top of the board.
+
+        Runs once every author has finished month-end settlement and the
+        board holds this month's books, including those that just entered
+        V. Each listed book has its own rank, and the whole pool,
+        ``readers_per_listed_book`` per listed book, is paid out once.
+        """
+        self._board_due = False
+        top = self._top(self.config.board_size)
+        if not top:
+            return
+        listed = len(top)
+        pool = self.config.readers_per_listed_book * listed
+        total_weight = self._rank_weights[listed]
+        for rank, index in enumerate(top, 1):
+            player = self.players[index]
+            gain = int(pool * rank ** -self.config.rank_exponent / total_weight)
+            player.book_favorites += gain
+            player.favorites_delta_this_month += gain
+            fans_gained = gain // self.config.favorites_per_fan
+            player.fans += fans_gained
+            player.fans_delta_this_month += fans_gained
+            print(
+                f"【新书千字榜】{player.name} 本月榜单排名第 {rank} 名，"
+                f"新增收藏 {gain} 个，当前收藏 {player.book_favorites} 个。"
+            )
+
+    def tips_for(self, player: Player) -> int:
+        """Month-end tips for ``player``: its favorites share of the tip pool."""
+        if not player.signed or self.total_signed_favorites <= 0:
+            return 0
+        share = self._signed_favorites[self._ids[id(player)]]
+        return int(self.tip_pool * share / self.total_signed_favorites)
+
+    def step(self, policy: Policy | None = None) -> None:
+        """Advance every author by one period, rolling all events in one batch."""
+        choose = policy or weighted_policy(DEFAULT_PLAN_WEIGHTS)
+        rng = self.rng
+        for player in self.players:
+            player.begin_period(choose(player, rng))
+        for player, key in zip(self.players, self.deck.roll_batch(self.players, rng)):
+            player.last_event = key
+            player.end_period()
+        if self._board_due:
+            # 所有作者都完成月末结算后，先把本月入 V 的书放进榜单，再按名次分配新读者。
+            self._sync(settling=True)
+            self._settle_board()
+        self._sync()
+
+    def run(self, months: int, policy: Policy | None = None, quiet: bool = True) -> None:
+        """Advance ``months`` months (three periods each) in lockstep."""
+        periods = months * 3
+        if not quiet:
+            for _ in range(periods):
+                self.step(policy)
+            return
+        with open(os.devnull, "w", encoding="utf-8") as sink, redirect_stdout(sink):
+            for _ in range(periods):
+                self.step(policy)
+
+    def outcomes(self) -> Iterator[dict[str, Any]]:
+        """Per-author outcome records, compatible with ``OutcomeSummary.add_run``."""
+        for player in self.players:
+            yield {
+                "balance": player.balance,
+                "words": player.words,
+                "fans": player.fans,
+                "book_favorites": player.book_favorites,
+                "months": player.month - 1,
+                "signed": player.signed,
+                "in_v": player.in_v,
+                "finished": player.is_book_finished(),
+            }
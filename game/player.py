@@ -2,15 +2,22 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import ClassVar
+from dataclasses import dataclass, field
+from typing import Any, ClassVar
 import random
 
+from game.events import roll_period_event
+from game.utils import AliasTable
+
 
 def _clamp(value: int, minimum: int, maximum: int) -> int:
     return max(minimum, min(value, maximum))
 
 
+_FREE_TIP_AMOUNTS = (2, 5, 10, 20)
+_FREE_TIP_TABLE = AliasTable([4, 4, 1, 1])
+
+
 @dataclass
 class Player:
     SHOP_ACTIVITIES: ClassVar[dict[str, dict[str, int | str]]] = {
@@ -74,6 +81,9 @@ class Player:
     just_signed: bool = False
     just_in_v: bool = False
     just_moved: bool = False
+    last_event: str = ""  # 本旬触发的随机事件 key，没有事件时为空
+    market: Any = field(default=None, repr=False, compare=False)  # 共享市场模式
+    rng: random.Random = field(default_factory=random.Random, repr=False, compare=False)
 
     def _update_lifestyle(self) -> tuple[int, int, int]:
         """Update lifestyle costs and return monthly status deltas."""
@@ -150,16 +160,27 @@ class Player:
         self.motivation = _clamp(self.motivation + int(cfg["motivation"]), 0, 100)
 
     def advance_period(self, plan: str) -> None:
+        """推进一旬：执行计划、掷随机事件、结算。"""
+        self.begin_period(plan)
+        self.last_event = roll_period_event(self, self.rng)
+        self.end_period()
+
+    def begin_period(self, plan: str) -> None:
+        """一旬的前半段：只执行计划。
+
+        批量模拟先对所有作者调用 begin_period，再用 EventDeck.roll_batch
+        统一掷事件，最后逐个 end_period，和 advance_period 的顺序一致。
+        """
         before = self.words
         if plan == "focus_writing":
-            words_gained = random.randint(8000, 12000)
+            words_gained = self.rng.randint(8000, 12000)
             self.words += words_gained
             self.words_this_month += words_gained
             self.stress += 8
             self.health -= 4
             self.motivation += 3
-            fans_gained = random.randint(3, 10)
-            favorites_gained = random.randint(20, 60)
+            fans_gained = self.rng.randint(3, 10)
+            favorites_gained = self.rng.randint(20, 60)
             self.fans += fans_gained
             self.book_favorites += favorites_gained
             self.fans_delta_this_month += fans_gained
@@ -169,14 +190,16 @@ class Player:
             self.health = min(100, self.health + 5)
             self.motivation = min(100, self.motivation + 2)
         else:
-            words_gained = random.randint(2000, 4000)
+            words_gained = self.rng.randint(2000, 4000)
             self.words += words_gained
             self.words_this_month += words_gained
             self.balance += 1500
             self.stress += 2
             self.motivation -= 1
-
         self.last_period_words = self.words - before
+
+    def end_period(self) -> None:
+        """一旬的后半段：压力惩罚、数值截断、月末结算和过劳检查。"""
         if self.stress > 70:
             self.health -= 5
 
@@ -266,15 +289,15 @@ class Player:
     def _apply_new_book_rank_boost(self) -> None:
         base = max(1, 30 - self.book_favorites // 300)
         upper = min(base + 10, 30)
-        rank = random.randint(base, upper)
+        rank = self.rng.randint(base, upper)
         if 1 <= rank <= 3:
-            gain = random.randint(5000, 10000)
+            gain = self.rng.randint(5000, 10000)
         elif 4 <= rank <= 10:
-            gain = random.randint(2000, 6000)
+            gain = self.rng.randint(2000, 6000)
         elif 11 <= rank <= 20:
-            gain = random.randint(800, 2000)
+            gain = self.rng.randint(800, 2000)
         else:
-            gain = random.randint(200, 600)
+            gain = self.rng.randint(200, 600)
         self.book_favorites += gain
         self.favorites_delta_this_month += gain
         fans_gained = gain // 50
@@ -286,19 +309,21 @@ class Player:
         )
 
     def _calc_tips(self) -> int:
+        if self.market is not None:
+            return self.market.tips_for(self)
         if not self.signed:
             return 0
         if not self.in_v:
             probability = 0.05 + min(self.book_favorites, 1000) / 1000 * 0.10
-            if random.random() > probability:
+            if self.rng.random() > probability:
                 return 0
-            return random.choices([2, 5, 10, 20], weights=[4, 4, 1, 1], k=1)[0]
+            return _FREE_TIP_AMOUNTS[_FREE_TIP_TABLE.sample(self.rng)]
         scale = max(self.book_favorites, self.fans * 2)
         probability = 0.2 + min(scale, 10000) / 10000 * 0.6
-        if random.random() > probability:
+        if self.rng.random() > probability:
             return 0
         base = scale / 100
-        amount = int(random.gauss(base, max(1, base / 3)))
+        amount = int(self.rng.gauss(base, max(1, base / 3)))
         return max(0, min(1000, amount))
 
     def _end_of_month(self) -> None:
@@ -311,8 +336,12 @@ class Player:
         self.monthly_tips = 0
         self._check_in_v()
         if self.in_v and not self.new_rank_used:
-            self._apply_new_book_rank_boost()
-            self.new_rank_used = True
+            if self.market is not None:
+                # 市场模式：新书期内每月按真实榜单名次分配新读者。
+                self.market.settle_new_book_board(self)
+            else:
+                self._apply_new_book_rank_boost()
+                self.new_rank_used = True
         if not self.signed:
             status_note = "当前未签约，暂无收入"
         elif not self.in_v:
@@ -324,7 +353,7 @@ class Player:
                 int(self.book_favorites * 1.5),
                 int(self.fans * 2.5),
             )
-            unit_royalty = random.uniform(0.22, 0.28)
+            unit_royalty = self.rng.uniform(0.22, 0.28)
             thousands = self.words_this_month / 1000
             self.monthly_royalty = int(thousands * approx_subs * unit_royalty)
             status_note = "已签约且入 V，有稿费和打赏收入"
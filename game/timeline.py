@@ -0,0 +1,178 @@
+"""Delta-encoded action history for undo, redo, time travel and replay.
+
+Every player action is logged as one byte. The undo ring buffer stores,
+per action, only the ``Player`` fields the action changed. RNG state is
+not stored: ``Game`` reseeds the player's generator from the session
+seed and the action index before every action, so re-running an action
+reproduces it exactly. Periodic full keyframes bound how far a time
+travel has to replay.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, fields
+from typing import Any, Iterator
+
+from game.player import Player
+
+PLANS: tuple[str, ...] = ("focus_writing", "part_time", "rest", "slack")
+RENT_LEVELS: tuple[str, ...] = ("800", "1200", "2000", "3000")
+FOOD_LEVELS: tuple[str, ...] = ("600", "1000", "1600", "2400")
+
+# One byte per logged action: (Game method, arguments).
+ACTIONS: tuple[tuple[str, tuple[str, ...]], ...] = (
+    *(("step", (plan,)) for plan in PLANS),
+    *(("apply_activity", (activity,)) for activity in Player.SHOP_ACTIVITIES),
+    *(
+        ("set_lifestyle", (rent, food))
+        for rent in RENT_LEVELS
+        for food in FOOD_LEVELS
+    ),
+)
+ACTION_CODES: dict[tuple[str, tuple[str, ...]], int] = {
+    action: code for code, action in enumerate(ACTIONS)
+}
+
+# Player fields that make up the snapshot; name is fixed and rng/market
+# are handles rather than state.
+STATE_FIELDS: tuple[str, ...] = tuple(
+    f.name for f in fields(Player) if f.name not in ("name", "rng", "market")
+)
+
+Pending = tuple[int, int, int] | None  # words, month, period
+
+
+def encode_action(method: str, args: tuple[str, ...]) -> int:
+    try:
+        return ACTION_CODES[(method, args)]
+    except KeyError:
+        raise ValueError(f"无法记录的操作：{method}{args}") from None
+
+
+def snapshot(player: Player) -> tuple[Any, ...]:
+    return tuple(getattr(player, name) for name in STATE_FIELDS)
+
+
+def restore(player: Player, state: tuple[Any, ...]) -> None:
+    for name, value in zip(STATE_FIELDS, state):
+        setattr(player, name, value)
+
+
+@dataclass(frozen=True, slots=True)
+class Delta:
+    """Fields one action changed, with their values from before it ran."""
+
+    changed: bytes  # indices into STATE_FIELDS
+    before: tuple[Any, ...]
+    history_len: int
+    book_len: int
+    pending: Pending
+
+    @classmethod
+    def between(
+        cls,
+        before: tuple[Any, ...],
+        after: tuple[Any, ...],
+        history_len: int,
+        book_len: int,
+        pending: Pending,
+    ) -> Delta:
+        changed = bytes(i for i, (a, b) in enumerate(zip(before, after)) if a != b)
+        return cls(changed, tuple(before[i] for i in changed), history_len, book_len, pending)
+
+    def undo(self, player: Player) -> None:
+        for index, value in zip(self.changed, self.before):
+            setattr(player, STATE_FIELDS[index], value)
+
+
+@dataclass(frozen=True, slots=True)
+class Keyframe:
+    tick: int
+    state: tuple[Any, ...]
+    history_len: int
+    book_len: int
+    pending: Pending
+
+
+class Timeline:
+    """Action log plus bounded undo ring, redo stack and keyframes."""
+
+    def __init__(
+        self,
+        origin: Keyframe,
+        undo_limit: int = 16,
+        keyframe_interval: int = 32,
+        keyframe_limit: int = 2,
+    ) -> None:
+        self.actions = bytearray()
+        self.origin = origin
+        self.keyframe_interval = keyframe_interval
+        self._undo: deque[Delta] = deque(maxlen=undo_limit)
+        self._redo = bytearray()  # 最后一个字节是下一次重做的操作
+        self._keyframes: deque[Keyframe] = deque(maxlen=keyframe_limit)
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self.actions)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def record(self, code: int, delta: Delta, keep_redo: bool = False) -> None:
+        self.actions.append(code)
+        self._undo.append(delta)
+        if not keep_redo:
+            self._redo.clear()
+
+    def wants_keyframe(self) -> bool:
+        return len(self.actions) % self.keyframe_interval == 0
+
+    def add_keyframe(self, keyframe: Keyframe) -> None:
+        self._keyframes.append(keyframe)
+
+    def pop_undo(self) -> Delta | None:
+        """Pop the last action onto the redo stack and return its delta.
+
+        Returns ``None`` when the delta has already fallen out of the ring;
+        the action is then left in place for a keyframe-based rewind.
+        """
+        if not self._undo:
+            return None
+        delta = self._undo.pop()
+        self._redo.append(self.actions.pop())
+        self._drop_keyframes_after(len(self.actions))
+        return delta
+
+    def pop_redo(self) -> int | None:
+        return self._redo.pop() if self._redo else None
+
+    def rewind(self, tick: int) -> tuple[Keyframe, bytes]:
+        """Cut the log back to the keyframe at or before ``tick``.
+
+        Returns that keyframe and the actions to re-run to reach ``tick``.
+        Actions after ``tick`` move to the redo stack.
+        """
+        keyframe = self.origin
+        for candidate in self._keyframes:
+            if candidate.tick <= tick:
+                keyframe = candidate
+        self._redo.extend(reversed(self.actions[tick:]))
+        replay = bytes(self.actions[keyframe.tick : tick])
+        del self.actions[keyframe.tick :]
+        self._undo.clear()
+        self._drop_keyframes_after(keyframe.tick)
+        return keyframe, replay
+
+    def _drop_keyframes_after(self, tick: int) -> None:
+        while self._keyframes and self._keyframes[-1].tick > tick:
+            self._keyframes.pop()
+
+
+def decode_actions(codes: bytes) -> Iterator[tuple[str, tuple[str, ...]]]:
+    for code in codes:
+        yield ACTIONS[code]
@@ -1,3 +1,83 @@
 """Shared utility helpers for the game package."""
 
-# TODO: Add reusable helper functions.
+from __future__ import annotations
+
+from typing import Any, Sequence
+import random
+
+
+def lttb(
+    xs: Sequence[float], ys: Sequence[float], threshold: int
+) -> tuple[list[float], list[float]]:
+    """Downsample a series with Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last points and, for every bucket in between, the
+    point spanning the largest triangle with its neighbours, so peaks and
+    dips survive while the chart only has ``threshold`` points to draw.
+    """
+    length = len(xs)
+    if len(ys) != length:
+        raise ValueError("xs and ys must have the same length")
+    if threshold >= length or threshold < 3:
+        return list(xs), list(ys)
+
+    sampled_x = [xs[0]]
+    sampled_y = [ys[0]]
+    bucket_size = (length - 2) / (threshold - 2)
+    anchor = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        next_end = min(int((bucket + 2) * bucket_size) + 1, length)
+
+        # Average of the next bucket is the third triangle vertex.
+        span = next_end - end
+        avg_x = sum(xs[end:next_end]) / span
+        avg_y = sum(ys[end:next_end]) / span
+
+        ax, ay = xs[anchor], ys[anchor]
+        best_area = -1.0
+        best = start
+        for i in range(start, end):
+            area = abs((ax - avg_x) * (ys[i] - ay) - (ax - xs[i]) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = i
+        sampled_x.append(xs[best])
+        sampled_y.append(ys[best])
+        anchor = best
+
+    sampled_x.append(xs[-1])
+    sampled_y.append(ys[-1])
+    return sampled_x, sampled_y
+
+
+class AliasTable:
+    """Walker/Vose alias table: O(n) to build, O(1) per weighted sample."""
+
+    def __init__(self, weights: Sequence[float]) -> None:
+        total = float(sum(weights))
+        count = len(weights)
+        if count == 0 or total <= 0:
+            raise ValueError("AliasTable needs at least one positive weight")
+        scaled = [w * count / total for w in weights]
+        self.prob = [1.0] * count
+        self.alias = list(range(count))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            lo = small.pop()
+            hi = large.pop()
+            self.prob[lo] = scaled[lo]
+            self.alias[lo] = hi
+            scaled[hi] -= 1.0 - scaled[lo]
+            (small if scaled[hi] < 1.0 else large).append(hi)
+
+    def __len__(self) -> int:
+        return len(self.prob)
+
+    def sample(self, rng: Any = random) -> int:
+        """Draw one index using a single uniform from ``rng``."""
+        u = rng.random() * len(self.prob)
+        index = int(u)
+        return index if u - index < self.prob[index] else self.alias[index]
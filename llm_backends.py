@@ -0,0 +1,56 @@
+"""Lazy registry of LLM backends used by story generation and the UI.
+
+Backends are registered as ``"module:function"`` strings and imported on
+first use, so importing this module, ``story_api`` or ``game.*`` never
+pulls in ``openai`` or any other client library.
+"""
+
+from __future__ import annotations
+
+from typing import Callable
+import importlib
+import os
+
+Backend = Callable[[str], str]
+
+DEFAULT_BACKEND = "deepseek"
+
+_REGISTRY: dict[str, str | Backend] = {
+    "deepseek": "deepseek_client:ask_deepseek",
+}
+_LOADED: dict[str, Backend] = {}
+
+
+def register_backend(name: str, target: str | Backend) -> None:
+    """Register ``target`` (a callable or ``"module:function"``) as ``name``."""
+    _REGISTRY[name] = target
+    _LOADED.pop(name, None)
+
+
+def available_backends() -> list[str]:
+    return sorted(_REGISTRY)
+
+
+def get_backend(name: str | None = None) -> Backend:
+    """Resolve a backend by name, defaulting to ``$LLM_BACKEND`` or deepseek."""
+    name = name or os.getenv("LLM_BACKEND", DEFAULT_BACKEND)
+    backend = _LOADED.get(name)
+    if backend is not None:
+        return backend
+    try:
+        target = _REGISTRY[name]
+    except KeyError:
+        raise ValueError(
+            f"未知的 LLM 后端：{name}，可选：{', '.join(available_backends())}"
+        ) from None
+    if isinstance(target, str):
+        module_name, _, attr = target.partition(":")
+        backend = getattr(importlib.import_module(module_name), attr)
+    else:
+        backend = target
+    _LOADED[name] = backend
+    return backend
+
+
+def ask_llm(prompt: str, backend: str | None = None) -> str:
+    return get_backend(backend)(prompt)
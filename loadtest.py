@@ -0,0 +1,311 @@
+"""Concurrent-user load test for the Streamlit app.
+
+Virtual users play realistic sessions against ``app.py`` through
+Streamlit's app-testing API (``streamlit.testing.v1.AppTest``).
+A session picks a lifestyle, buys things in the shop, steps with every
+plan and presses the AI buttons. The LLM backend is swapped for a local
+fake with configurable latency, so no network is used.
+
+``AppTest`` swaps process-wide globals (the Streamlit runtime singleton,
+config options) around every run, so sessions cannot share a process.
+Every virtual user gets its own freshly spawned process instead; users
+start together behind a barrier and compete for the CPU as they would
+on one server. The report gives rerun latency percentiles, reruns per
+second and each session's peak RSS growth over a warmed-up process.
+With ``--baseline`` the run fails (exit status 1) when a level regresses
+past ``--tolerance``; ``--save-baseline`` writes the current results
+instead. Numbers depend on the machine, so compare against a baseline
+recorded on the same hardware; without ``--baseline`` nothing is compared.
+The committed ``loadtest_baseline.json`` was recorded on one CPU core.
+
+    python loadtest.py --users 1,5,10,20 --periods 12
+    python loadtest.py --save-baseline   # writes loadtest_baseline.json
+    python loadtest.py --baseline loadtest_baseline.json
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from typing import Any, Callable
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+from game.analytics import QuantileSketch
+
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(_ROOT, "app.py")
+DEFAULT_BASELINE = os.path.join(_ROOT, "loadtest_baseline.json")
+
+SHOP_BUTTONS = ("看电影（80 元）", "按摩（200 元）", "KTV（300 元）", "健身（150 元）")
+FAKE_COMMENTS = (
+    "这章节奏真好，熬夜也要追！",
+    "作者大大今天还更吗？",
+    "男二怎么又下线了，我先杠为敬。",
+    "长评：伏笔回收得很漂亮，期待后续。",
+    "打卡，养肥了再来。",
+)
+
+# Compared against the baseline; "higher" means bigger is better.
+METRICS: dict[str, str] = {
+    "p50_ms": "lower",
+    "p95_ms": "lower",
+    "p99_ms": "lower",
+    "throughput": "higher",
+    "rss_mb_per_session": "lower",
+}
+
+
+def _install_fake_llm(latency: float) -> None:
+    """Route every LLM call to a local fake that sleeps ``latency`` seconds."""
+    import llm_backends
+
+    def fake_llm(prompt: str) -> str:
+        if latency:
+            time.sleep(latency)
+        return "\n".join(FAKE_COMMENTS)
+
+    llm_backends.register_backend("loadtest-fake", fake_llm)
+    os.environ["LLM_BACKEND"] = "loadtest-fake"
+
+
+def _widget(widgets: Any, label: str) -> Any:
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    return None
+
+
+class VirtualUser:
+    """One scripted player session; every rerun is timed into ``sketch``."""
+
+    def __init__(self, seed: int, periods: int, timeout: float) -> None:
+        from streamlit.testing.v1 import AppTest
+
+        self.rng = random.Random(seed)
+        self.periods = periods
+        self.app = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.sketch = QuantileSketch()
+        self.reruns = 0
+        self.errors = 0
+
+    def _run(self) -> None:
+        start = time.perf_counter()
+        try:
+            self.app.run()
+        except Exception:
+            self.errors += 1
+        else:
+            self.errors += len(self.app.exception)
+        self.sketch.add((time.perf_counter() - start) * 1000)
+        self.reruns += 1
+
+    def _click(self, label: str) -> bool:
+        button = _widget(self.app.button, label)
+        # A browser user cannot press a disabled button either.
+        if button is None or button.disabled:
+            return False
+        button.click()
+        self._run()
+        return True
+
+    def _choose(self, label: str, pick: Callable[[list[Any]], Any]) -> None:
+        radio = _widget(self.app.radio, label)
+        if radio is not None:
+            radio.set_value(pick(list(radio.options)))
+
+    def play(self) -> None:
+        rng = self.rng
+        self._run()
+        self._choose("房租档位", rng.choice)
+        self._choose("伙食档位", rng.choice)
+        self._click("确认生活成本设置")
+        for _ in range(self.periods):
+            if rng.random() < 0.3:
+                self._click(rng.choice(SHOP_BUTTONS))
+            if rng.random() < 0.2:
+                self._click("生成写作灵感")
+            if rng.random() < 0.1:
+                self._click("获取 AI 编辑建议")
+            self._choose("计划", rng.choice)
+            self._click("推进到下一旬")
+            if rng.random() < 0.05:
+                self._click("↩️ 撤销")
+
+
+def _peak_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - not available on Windows
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def _play_user(
+    seed: int,
+    periods: int,
+    llm_latency: float,
+    timeout: float,
+    corpus_dir: str,
+    barrier: Any,
+) -> dict[str, Any]:
+    """Play one session in this (fresh) process and report its numbers."""
+    # AppTest sets session state outside a script run, and each time this
+    # logs a bare-mode "missing ScriptRunContext" warning.
+    logging.getLogger(
+        "streamlit.runtime.scriptrunner_utils.script_run_context"
+    ).disabled = True
+    os.environ["STORY_CORPUS_PATH"] = os.path.join(corpus_dir, f"corpus-{seed}.jsonl")
+    _install_fake_llm(llm_latency)
+    with open(os.devnull, "w", encoding="utf-8") as sink, redirect_stdout(sink):
+        # Warm imports (charts pull in pandas) and Streamlit's caches with a
+        # short session before taking the RSS baseline.
+        VirtualUser(seed - 1_000_000, 3, timeout).play()
+        baseline_rss = _peak_rss_mb()
+        user = VirtualUser(seed, periods, timeout)
+        barrier.wait()
+        start = time.time()
+        user.play()
+        end = time.time()
+    return {
+        "sketch": user.sketch,
+        "reruns": user.reruns,
+        "errors": user.errors,
+        "start": start,
+        "end": end,
+        "rss_mb": max(0.0, _peak_rss_mb() - baseline_rss),
+    }
+
+
+def run_level(
+    users: int, periods: int, seed: int, llm_latency: float, timeout: float
+) -> dict[str, Any]:
+    """Run ``users`` concurrent sessions, one process each, and summarise them."""
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager, tempfile.TemporaryDirectory(
+        prefix="loadtest-"
+    ) as corpus_dir:
+        barrier = manager.Barrier(users)
+        with ProcessPoolExecutor(max_workers=users, mp_context=context) as pool:
+            futures = [
+                pool.submit(
+                    _play_user,
+                    seed + i,
+                    periods,
+                    llm_latency,
+                    timeout,
+                    corpus_dir,
+                    barrier,
+                )
+                for i in range(users)
+            ]
+            sessions = [future.result() for future in futures]
+
+    wall = max(s["end"] for s in sessions) - min(s["start"] for s in sessions)
+    sketch = QuantileSketch()
+    for session in sessions:
+        sketch.merge(session["sketch"])
+    reruns = sum(session["reruns"] for session in sessions)
+    return {
+        "users": users,
+        "reruns": reruns,
+        "errors": sum(session["errors"] for session in sessions),
+        "wall_s": wall,
+        "throughput": reruns / wall if wall else 0.0,
+        "p50_ms": sketch.quantile(0.5),
+        "p95_ms": sketch.quantile(0.95),
+        "p99_ms": sketch.quantile(0.99),
+        "rss_mb_per_session": sum(s["rss_mb"] for s in sessions) / users,
+    }
+
+
+def compare(
+    results: list[dict[str, Any]], baseline: list[dict[str, Any]], tolerance: float
+) -> list[str]:
+    """Describe every metric that regressed by more than ``tolerance``."""
+    by_users = {entry["users"]: entry for entry in baseline}
+    problems = []
+    for entry in results:
+        reference = by_users.get(entry["users"])
+        if reference is None:
+            continue
+        if entry["errors"] > reference["errors"]:
+            problems.append(
+                f"{entry['users']} users: errors "
+                f"{reference['errors']} -> {entry['errors']}"
+            )
+        for metric, better in METRICS.items():
+            old, new = reference[metric], entry[metric]
+            if not old:
+                continue
+            if better == "lower":
+                regressed = new > old * (1 + tolerance)
+            else:
+                regressed = new < old * (1 - tolerance)
+            if regressed:
+                problems.append(
+                    f"{entry['users']} users: {metric} {old:.2f} -> {new:.2f}"
+                )
+    return problems
+
+
+def _print_report(results: list[dict[str, Any]]) -> None:
+    print(
+        f"{'users':>5} {'reruns':>7} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'reruns/s':>9} {'MB/session':>10}"
+    )
+    for entry in results:
+        print(
+            f"{entry['users']:>5} {entry['reruns']:>7} {entry['errors']:>6} "
+            f"{entry['p50_ms']:>8.1f} {entry['p95_ms']:>8.1f} {entry['p99_ms']:>8.1f} "
+            f"{entry['throughput']:>9.1f} {entry['rss_mb_per_session']:>10.2f}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", default="1,5,10,20", help="逗号分隔的并发用户数")
+    parser.add_argument("--periods", type=int, default=12, help="每个用户推进的旬数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="假 LLM 的延迟（秒）")
+    parser.add_argument("--timeout", type=float, default=60.0, help="单次 rerun 超时（秒）")
+    parser.add_argument("--baseline", default=None, help="对比的基线 JSON 文件")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="允许的相对退化")
+    args = parser.parse_args(argv)
+    user_counts = [int(part) for part in args.users.split(",") if part.strip()]
+
+    results = [
+        run_level(users, args.periods, args.seed, args.llm_latency, args.timeout)
+        for users in user_counts
+    ]
+    _print_report(results)
+
+    if args.save_baseline:
+        baseline_path = args.baseline or DEFAULT_BASELINE
+        with open(baseline_path, "w", encoding="utf-8") as fp:
+            json.dump(results, fp, indent=2)
+            fp.write("\n")
+        print(f"基线已保存到 {baseline_path}")
+        return 0
+    # Baselines are machine-specific, so only compare when asked to.
+    if args.baseline is None:
+        return 0
+    with open(args.baseline, encoding="utf-8") as fp:
+        problems = compare(results, json.load(fp), args.tolerance)
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,25 @@
+import os
 from typing import Dict, List
 
-from deepseek_client import ask_deepseek
+from llm_backends import ask_llm
+from story_index import get_story_index
+
+# online：每次调用 LLM，成功的回复收进本地语料，失败时走本地检索；
+# fast：本地语料里同状态的条目足够时直接检索，不够再调用 LLM；
+# offline：完全不联网，只用本地检索。
+STORY_API_MODES = ("online", "fast", "offline")
+
+
+def _mode() -> str:
+    mode = os.getenv("STORY_API_MODE", "online").strip().lower()
+    return mode if mode in STORY_API_MODES else "online"
+
+
+def _use_local(kind: str, state: Dict, n: int = 1) -> bool:
+    mode = _mode()
+    if mode == "offline":
+        return True
+    return mode == "fast" and get_story_index().count_near(kind, state) >= 2 * n
 
 
 def _summarize_state(state: Dict) -> str:
@@ -31,19 +50,30 @@ def _summarize_state(state: Dict) -> str:
     return "，".join(summary_parts)
 
 
+def _local_one(kind: str, state: Dict) -> str:
+    picked = get_story_index().query(kind, state, n=1)
+    return picked[0] if picked else ""
+
+
 def generate_story_idea(state: Dict) -> str:
+    if _use_local("idea", state):
+        return _local_one("idea", state)
     summary = _summarize_state(state)
     prompt = (
         "你是一名熟悉晋江风格的网文编辑，根据作者当前状态，给出一个简短的一句话写作灵感，用中文回答。"
         f"\n作者状态摘要：{summary}"
     )
     try:
-        return str(ask_deepseek(prompt))
+        idea = str(ask_llm(prompt))
     except Exception:
-        return "灵感服务器有点累了，先根据你当前的剧情节奏，随便写一段你自己也会感兴趣的小场景。"
+        return _local_one("idea", state)
+    get_story_index().add("idea", state, [idea])
+    return idea
 
 
 def generate_plot_conflict(state: Dict) -> str:
+    if _use_local("conflict", state):
+        return _local_one("conflict", state)
     summary = _summarize_state(state)
     prompt = (
         "你是网文责编，请基于作者当前进度，生成一个适合当下节奏的剧情冲突建议。"
@@ -52,12 +82,16 @@ def generate_plot_conflict(state: Dict) -> str:
         f"\n作者状态摘要：{summary}"
     )
     try:
-        return str(ask_deepseek(prompt))
+        conflict = str(ask_llm(prompt))
     except Exception:
-        return ""
+        return _local_one("conflict", state)
+    get_story_index().add("conflict", state, [conflict])
+    return conflict
 
 
 def generate_reader_comments(state: Dict, n: int = 5) -> List[str]:
+    if _use_local("comment", state, n):
+        return get_story_index().query("comment", state, n=n)
     summary = _summarize_state(state)
     prompt = (
         "这是晋江/长佩风格的读者评论区，请根据作者状态生成评论。"
@@ -67,13 +101,10 @@ def generate_reader_comments(state: Dict, n: int = 5) -> List[str]:
         f"\n作者状态摘要：{summary}"
     )
     try:
-        response = ask_deepseek(prompt)
-        lines = [line.strip() for line in str(response).split("\n")]
-        comments = [line for line in lines if line]
-        return comments[:n]
+        response = ask_llm(prompt)
     except Exception:
-        return [
-            "这章氛围感拉满，太会写了吧！",
-            "作者大大快更新呀，孩子等不及了~",
-            "这一段逻辑有点怪，我先杠一下，但还是爱看。",
-        ]
+        return get_story_index().query("comment", state, n=n)
+    lines = [line.strip() for line in str(response).split("\n")]
+    comments = [line for line in lines if line]
+    get_story_index().add("comment", state, comments)
+    return comments[:n]
@@ -0,0 +1,212 @@
+"""Offline retrieval index of reader comments, story ideas and plot conflicts.
+
+Entries are harvested from past LLM replies and tagged with coarse state
+features (signed, in-V, stress band, update tier, words bucket). A query
+walks the feature keys nearest to the current state and samples distinct
+entries from them, so it answers locally in microseconds.
+
+The corpus lives in the user's cache directory (``STORY_CORPUS_PATH``
+overrides it) and stops growing once it reaches ``MAX_CORPUS_BYTES``.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Mapping
+import json
+import os
+import random
+import threading
+
+from game.history import UPDATE_TIERS
+
+KINDS = ("comment", "idea", "conflict")
+WORD_BUCKETS = (10_000, 60_000, 120_000, 200_000, 300_000)
+
+# signed, in_v, stress band, update tier, words bucket
+Features = tuple[int, int, int, int, int]
+_FEATURE_WEIGHTS = (3, 3, 1, 1, 1)
+
+DEFAULT_CORPUS_PATH = os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "novel-author-simulator",
+    "story_corpus.jsonl",
+)
+# Harvesting stops at this size; the corpus only needs to cover the states.
+MAX_CORPUS_BYTES = 4 << 20
+
+# 兜底语料：没有任何 LLM 历史时也能给出像样的结果。
+SEED_ENTRIES: tuple[tuple[str, Features, str], ...] = (
+    ("comment", (0, 0, 1, 1, 0), "这章氛围感拉满，太会写了吧！"),
+    ("comment", (0, 0, 1, 1, 0), "作者大大快更新呀，孩子等不及了~"),
+    ("comment", (0, 0, 1, 1, 0), "这一段逻辑有点怪，我先杠一下，但还是爱看。"),
+    ("comment", (0, 0, 1, 0, 1), "开头有点慢热，不过人设挺有意思，先收藏了。"),
+    ("comment", (1, 0, 1, 1, 1), "恭喜签约！以后就是追更人了，日更能保证吗？"),
+    ("comment", (1, 0, 2, 2, 2), "最近更新好勤快，作者注意身体啊。"),
+    ("comment", (1, 1, 1, 1, 2), "入V了也会一直支持的，已订阅全文。"),
+    ("comment", (1, 1, 2, 3, 3), "一天三更是真的猛，但这章感觉有点赶。"),
+    ("comment", (1, 1, 1, 0, 3), "怎么又断更了……养肥了再来看。"),
+    ("comment", (1, 1, 1, 1, 4), "快完结了好舍不得，番外安排上！"),
+    ("comment", (1, 1, 3, 2, 3), "感觉作者状态不太好，文风有点飘，休息一下吧。"),
+    (
+        "comment",
+        (1, 1, 1, 1, 3),
+        "长评：主线推进得很稳，感情线和事业线互相咬合，就是配角戏份可以再收一收。",
+    ),
+    (
+        "idea",
+        (0, 0, 1, 1, 0),
+        "灵感服务器有点累了，先根据你当前的剧情节奏，随便写一段你自己也会感兴趣的小场景。",
+    ),
+    ("idea", (0, 0, 1, 1, 0), "让主角在开篇第一章就失去最重要的东西，用一整卷去找回来。"),
+    ("idea", (1, 0, 1, 1, 1), "给反派一段温柔的回忆，让读者开始犹豫该站哪一边。"),
+    ("idea", (1, 1, 1, 2, 2), "写一场所有伏笔同时回收的宴会戏，让读者截图转发。"),
+    ("idea", (1, 1, 2, 3, 3), "节奏已经很快了，这一章不妨停下来写一段日常，让角色喘口气。"),
+    ("idea", (1, 1, 1, 1, 4), "开始为结局铺路：让主角做一个无法回头的选择。"),
+    ("conflict", (0, 0, 1, 1, 0), "主角的秘密身份在一次意外中被同伴撞破，对方却选择了沉默。"),
+    ("conflict", (1, 0, 1, 1, 1), "男女主因为一次误会冷战，偏偏此时家族要求两人联姻。"),
+    ("conflict", (1, 1, 1, 2, 2), "公司内部有人泄露了机密，所有线索都指向主角最信任的人。"),
+    ("conflict", (1, 1, 2, 2, 3), "世界屏障出现裂缝，主角必须在救师门和救恋人之间二选一。"),
+    ("conflict", (1, 1, 1, 1, 4), "最终决战前夜，宿敌找上门来，提出了一个无法拒绝的联手条件。"),
+)
+
+
+def state_features(state: Mapping[str, object]) -> Features:
+    """Map a ``Game.get_state()``-style dict onto index features."""
+    stress = int(state.get("stress", 0) or 0)
+    words = int(state.get("words", 0) or 0)
+    tier = str(state.get("update_tier", "normal"))
+    words_bucket = sum(1 for edge in WORD_BUCKETS if words >= edge)
+    return (
+        int(bool(state.get("signed", False))),
+        int(bool(state.get("in_v", False))),
+        min(max(stress, 0) // 25, 3),
+        UPDATE_TIERS.index(tier if tier in UPDATE_TIERS else "normal"),
+        words_bucket,
+    )
+
+
+def _distance(a: Features, b: Features) -> int:
+    return sum(w * abs(x - y) for w, x, y in zip(_FEATURE_WEIGHTS, a, b))
+
+
+class StoryIndex:
+    """Feature-keyed corpus with nearest-neighbour lookup over feature keys."""
+
+    def __init__(
+        self, path: str | None = None, max_bytes: int = MAX_CORPUS_BYTES
+    ) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        # Harvested bytes so far, counted the same way whether or not they
+        # are persisted, so an in-memory index is capped too.
+        self._bytes = 0
+        # Streamlit sessions share one index from several threads.
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[Features, list[str]]] = {k: {} for k in KINDS}
+        self._seen: set[tuple[str, str]] = set()
+        # (kind, features) -> feature keys of that kind ordered by distance
+        self._neighbours: dict[tuple[str, Features], list[Features]] = {}
+        for kind, features, text in SEED_ENTRIES:
+            self._insert(kind, features, text)
+        if path and os.path.exists(path):
+            self._load(path)
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def _insert(self, kind: str, features: Features, text: str) -> bool:
+        if kind not in self._entries:
+            raise ValueError(f"unknown entry kind: {kind!r}")
+        text = text.strip()
+        if not text or (kind, text) in self._seen:
+            return False
+        self._seen.add((kind, text))
+        bucket = self._entries[kind].get(features)
+        if bucket is None:
+            self._entries[kind][features] = [text]
+            # A new feature key changes every neighbour ordering for this kind.
+            self._neighbours = {
+                key: value for key, value in self._neighbours.items() if key[0] != kind
+            }
+        else:
+            bucket.append(text)
+        return True
+
+    def _load(self, path: str) -> None:
+        with open(path, encoding="utf-8") as fp:
+            for line in fp:
+                self._bytes += len(line.encode("utf-8"))
+                try:
+                    record = json.loads(line)
+                    self._insert(
+                        record["kind"], tuple(record["features"]), record["text"]
+                    )
+                except (ValueError, KeyError, TypeError):
+                    continue
+
+    def add(self, kind: str, state: Mapping[str, object], texts: Iterable[str]) -> int:
+        """Harvest ``texts`` for ``state``; return how many were new.
+
+        Nothing more is harvested once the corpus reaches ``max_bytes``.
+        """
+        features = state_features(state)
+        with self._lock:
+            lines = []
+            for text in texts:
+                record = {"kind": kind, "features": list(features), "text": text.strip()}
+                line = json.dumps(record, ensure_ascii=False) + "\n"
+                size = len(line.encode("utf-8"))
+                if self._bytes + size > self.max_bytes:
+                    break
+                if self._insert(kind, features, text):
+                    self._bytes += size
+                    lines.append(line)
+            if lines and self.path:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as fp:
+                    fp.writelines(lines)
+        return len(lines)
+
+    def count_near(self, kind: str, state: Mapping[str, object]) -> int:
+        """Number of entries tagged with exactly this state's features."""
+        return len(self._entries[kind].get(state_features(state), ()))
+
+    def query(
+        self,
+        kind: str,
+        state: Mapping[str, object],
+        n: int = 1,
+        rng: random.Random | None = None,
+    ) -> list[str]:
+        """Return up to ``n`` distinct entries drawn from the nearest keys.
+
+        Candidates are gathered key by key in distance order until there are
+        ``2 * n`` of them, then sampled, so repeated calls stay varied.
+        """
+        features = state_features(state)
+        with self._lock:
+            neighbours = self._neighbours.get((kind, features))
+            if neighbours is None:
+                keys = self._entries[kind]
+                neighbours = sorted(keys, key=lambda key: _distance(key, features))
+                self._neighbours[(kind, features)] = neighbours
+            candidates: list[str] = []
+            for key in neighbours:
+                candidates.extend(self._entries[kind][key])
+                if len(candidates) >= 2 * n:
+                    break
+        rng = rng or random
+        return rng.sample(candidates, min(n, len(candidates)))
+
+
+_INDEX: StoryIndex | None = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_story_index() -> StoryIndex:
+    """Shared index, loaded from ``STORY_CORPUS_PATH`` on first use."""
+    global _INDEX
+    with _INDEX_LOCK:
+        if _INDEX is None:
+            _INDEX = StoryIndex(os.getenv("STORY_CORPUS_PATH", DEFAULT_CORPUS_PATH))
+        return _INDEX